@@ -43,10 +43,22 @@ HP_BAR_HEIGHT = 8
 HP_BAR_OFFSET_Y = 25 # Offset above player center for health bar
 INTERACTION_DISTANCE = 35 # Max distance to interact with fence
 
+# --- Movement Key Bitmask ---
+# Compact encoding of held WASD keys for input dicts and the network protocol
+# (cheaper to build and serialize than a per-key dict).
+KEY_MASK_W = 1 << 0
+KEY_MASK_S = 1 << 1
+KEY_MASK_A = 1 << 2
+KEY_MASK_D = 1 << 3
+
 # --- Player-Wall Proximity (used in collision.py) ---
 PLAYER_WALL_PROXIMITY_THRESHOLD = 5 # pixels
 
 # --- Projectiles ---
+# Wire quantization scale for projectile coordinates/velocities: values are
+# sent as round(value * scale) integers (0.25px precision at 4), which encode
+# far smaller than binary floats and well below visible error.
+PROJ_COORD_QUANT = 4
 PROJECTILE_RADIUS = 3
 PROJECTILE_SPEED = 8
 SHOOT_COOLDOWN_MS = 300